@@ -5,30 +5,36 @@ Login screen: USB status indicator + password or recovery code.
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QFrame
+    QLineEdit, QPushButton, QFrame, QInputDialog, QMessageBox
 )
 from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPixmap
 
 
+# Installed once on the QApplication (see main.py); rules are scoped to
+# #LoginScreen so they don't leak into other windows.
 STYLE_LOCKED = """
 QWidget#LoginScreen {
     background: #1a1a2e;
 }
-QLabel#title {
+#LoginScreen QLabel#title {
     color: #e0e0ff;
     font-size: 26px;
     font-weight: bold;
 }
-QLabel#subtitle {
+#LoginScreen QLabel#subtitle {
     color: #7070a0;
     font-size: 13px;
 }
-QLabel#usb_status {
-    font-size: 14px;
-    padding: 8px 16px;
+#LoginScreen QFrame#usb_status {
     border-radius: 8px;
 }
-QLineEdit#password_input {
+#LoginScreen QFrame#usb_status QLabel {
+    font-size: 14px;
+    background: transparent;
+    border: none;
+}
+#LoginScreen QLineEdit#password_input {
     background: #16213e;
     color: #e0e0ff;
     border: 1px solid #3030a0;
@@ -36,7 +42,7 @@ QLineEdit#password_input {
     padding: 10px 14px;
     font-size: 15px;
 }
-QPushButton#unlock_btn {
+#LoginScreen QPushButton#unlock_btn {
     background: #3030a0;
     color: #ffffff;
     border: none;
@@ -45,29 +51,50 @@ QPushButton#unlock_btn {
     font-size: 15px;
     font-weight: bold;
 }
-QPushButton#unlock_btn:hover {
+#LoginScreen QPushButton#unlock_btn:hover {
     background: #4040c0;
 }
-QPushButton#unlock_btn:disabled {
+#LoginScreen QPushButton#unlock_btn:disabled {
     background: #222240;
     color: #555580;
 }
-QLabel#error_label {
+#LoginScreen QLabel#error_label {
     color: #ff5252;
     font-size: 13px;
 }
-QPushButton#setup_btn {
+#LoginScreen QPushButton#setup_btn {
     background: transparent;
     color: #5555aa;
     border: none;
     font-size: 12px;
     text-decoration: underline;
 }
-QPushButton#setup_btn:hover {
+#LoginScreen QPushButton#setup_btn:hover {
     color: #8888cc;
 }
 """
 
+USB_OK_STYLE = (
+    "QFrame#usb_status { background: #003320; border: 1px solid #00e676; }"
+    "QFrame#usb_status QLabel { color: #00e676; }"
+)
+USB_MISSING_STYLE = (
+    "QFrame#usb_status { background: #330000; border: 1px solid #ff5252; }"
+    "QFrame#usb_status QLabel { color: #ff5252; }"
+)
+
+
+def _status_dot(color: str, size: int = 12) -> QPixmap:
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QColor(color))
+    painter.drawEllipse(0, 0, size, size)
+    painter.end()
+    return pixmap
+
 
 class LoginScreen(QWidget):
     """Emits unlock_requested(secret: str, is_recovery: bool)."""
@@ -78,9 +105,8 @@ class LoginScreen(QWidget):
     def __init__(self):
         super().__init__()
         self.setObjectName("LoginScreen")
-        self._usb_connected = False
+        self._usb_connected: bool | None = None
         self._build_ui()
-        self.setStyleSheet(STYLE_LOCKED)
 
     def _build_ui(self):
         layout = QVBoxLayout(self)
@@ -95,9 +121,21 @@ class LoginScreen(QWidget):
         subtitle.setObjectName("subtitle")
         subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-        self.usb_label = QLabel("⬤  Checking USB...")
-        self.usb_label.setObjectName("usb_status")
-        self.usb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # Status dot is a pre-rendered pixmap: no emoji font fallback/shaping
+        self._pm_ok = _status_dot("#00e676")
+        self._pm_missing = _status_dot("#ff5252")
+
+        self.usb_status = QFrame()
+        self.usb_status.setObjectName("usb_status")
+        status_row = QHBoxLayout(self.usb_status)
+        status_row.setContentsMargins(16, 8, 16, 8)
+        status_row.setSpacing(10)
+        self.usb_icon = QLabel()
+        self.usb_label = QLabel("Checking USB...")
+        status_row.addStretch()
+        status_row.addWidget(self.usb_icon)
+        status_row.addWidget(self.usb_label)
+        status_row.addStretch()
 
         self.pw_input = QLineEdit()
         self.pw_input.setObjectName("password_input")
@@ -133,7 +171,7 @@ class LoginScreen(QWidget):
         layout.addWidget(title_lbl)
         layout.addWidget(subtitle)
         layout.addSpacing(10)
-        layout.addWidget(self.usb_label)
+        layout.addWidget(self.usb_status)
         layout.addWidget(self.pw_input)
         layout.addWidget(self.error_label)
         layout.addWidget(self.unlock_btn)
@@ -144,23 +182,26 @@ class LoginScreen(QWidget):
         layout.addStretch()
 
     def set_usb_status(self, connected: bool):
+        if connected == self._usb_connected:
+            return
         self._usb_connected = connected
         if connected:
-            self.usb_label.setText("✅  USB Security Key: Connected")
-            self.usb_label.setStyleSheet(
-                "color: #00e676; background: #003320; border: 1px solid #00e676;"
-                "border-radius: 8px; padding: 8px 16px; font-size: 14px;"
-            )
-            self.unlock_btn.setEnabled(True)
-            self.pw_input.setEnabled(True)
+            self.usb_icon.setPixmap(self._pm_ok)
+            self.usb_label.setText("USB Security Key: Connected")
+            self.usb_status.setStyleSheet(USB_OK_STYLE)
         else:
-            self.usb_label.setText("❌  Insert your USB Security Key")
-            self.usb_label.setStyleSheet(
-                "color: #ff5252; background: #330000; border: 1px solid #ff5252;"
-                "border-radius: 8px; padding: 8px 16px; font-size: 14px;"
-            )
-            self.unlock_btn.setEnabled(False)
-            self.pw_input.setEnabled(False)
+            self.usb_icon.setPixmap(self._pm_missing)
+            self.usb_label.setText("Insert your USB Security Key")
+            self.usb_status.setStyleSheet(USB_MISSING_STYLE)
+        self.unlock_btn.setEnabled(connected)
+        self.pw_input.setEnabled(connected)
+
+    def set_busy(self, busy: bool):
+        """Block input while an unlock attempt is running."""
+        self.unlock_btn.setText("Unlocking…" if busy else "Unlock Vault")
+        self.unlock_btn.setEnabled(not busy and bool(self._usb_connected))
+        self.pw_input.setEnabled(not busy and bool(self._usb_connected))
+        self.forgot_btn.setEnabled(not busy)
 
     def show_error(self, msg: str):
         self.error_label.setText(f"⚠ {msg}")
@@ -185,8 +226,6 @@ class LoginScreen(QWidget):
         self.unlock_requested.emit(password, False)
 
     def _on_recovery_unlock(self):
-        from PyQt6.QtWidgets import QInputDialog, QMessageBox
-
         if not self._usb_connected:
             QMessageBox.warning(self, "USB Required", "Insert your USB key first.")
             return
@@ -3,6 +3,7 @@ Secure Desktop Vault - Main Entry Point
 Requires: PyQt6, cryptography, pyudev (Linux), pywin32 (Windows)
 """
 
+import logging
 import sys
 import os
 
@@ -10,9 +11,17 @@ import os
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
 from privexi.ui.main_window import MainWindow
+from privexi.login_screen import STYLE_LOCKED
+from privexi.setup_dialog import SETUP_STYLE
 
 
 def main():
+    # Diagnostics go to stderr; PRIVEXI_DEBUG=1 turns on debug output
+    logging.basicConfig(
+        level=logging.DEBUG if os.environ.get("PRIVEXI_DEBUG") else logging.WARNING,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+
     # High-DPI support
     os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
 
@@ -20,6 +29,8 @@ def main():
     app.setApplicationName("SecureVault")
     app.setOrganizationName("SecureVaultApp")
     app.setAttribute(Qt.ApplicationAttribute.AA_DontCreateNativeWidgetSiblings)
+    # One application-wide sheet, parsed once and shared by all screens
+    app.setStyleSheet(STYLE_LOCKED + SETUP_STYLE)
 
     window = MainWindow()
     window.show()
@@ -3,7 +3,10 @@ modules/security_log.py
 Logs security events without logging any secrets.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 from pathlib import Path
 
@@ -14,13 +17,24 @@ def setup_logger() -> logging.Logger:
     LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     logger = logging.getLogger("SecureVault")
     logger.setLevel(logging.INFO)
+    # Security events belong in the log file only, not on the console
+    logger.propagate = False
 
     if not logger.handlers:
-        fh = logging.FileHandler(LOG_PATH, encoding="utf-8")
+        # delay=True: the file is only opened once the first record is written
+        fh = logging.FileHandler(LOG_PATH, encoding="utf-8", delay=True)
         fh.setLevel(logging.INFO)
-        fmt = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+        # Raw epoch seconds: ordered and precise, with no strftime per record
+        fmt = logging.Formatter("%(created).6f [%(levelname)s] %(message)s")
         fh.setFormatter(fmt)
-        logger.addHandler(fh)
+
+        # Callers (often the Qt main loop) only enqueue; disk I/O runs on the
+        # listener thread.
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, fh, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
 
     return logger
 
@@ -30,12 +44,21 @@ _logger = setup_logger()
 
 def log_event(event: str, details: str = ""):
     """Log a security event. Never include passwords or keys."""
-    _logger.info(f"{event}" + (f" | {details}" if details else ""))
+    if details:
+        _logger.info("%s | %s", event, details)
+    else:
+        _logger.info("%s", event)
 
 
 def log_warning(event: str, details: str = ""):
-    _logger.warning(f"{event}" + (f" | {details}" if details else ""))
+    if details:
+        _logger.warning("%s | %s", event, details)
+    else:
+        _logger.warning("%s", event)
 
 
 def log_failure(event: str, details: str = ""):
-    _logger.error(f"{event}" + (f" | {details}" if details else ""))
+    if details:
+        _logger.error("%s | %s", event, details)
+    else:
+        _logger.error("%s", event)
@@ -3,19 +3,22 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QFileDialog, QHBoxLayout, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool
 
-from privexi.usb_key_manager import create_usb_key, KEY_FILE_NAME
+from privexi.usb_key_manager import KEY_FILE_NAME
+from privexi.workers import CreateKeyJob
 
+# Installed once on the QApplication (see main.py); rules are scoped to
+# #SetupDialog so they don't leak into other windows.
 SETUP_STYLE = """
-QDialog { background: #1a1a2e; }
-QLabel { color: #c0c0e0; font-size: 13px; }
-QLabel#title { color: #e0e0ff; font-size: 18px; font-weight: bold; }
-QLineEdit { background: #16213e; color: #e0e0ff; border: 1px solid #3030a0; border-radius: 6px; padding: 8px 12px; font-size: 13px; }
-QLineEdit:focus { border-color: #7070ff; }
-QPushButton { background: #3030a0; color: #ffffff; border: none; border-radius: 6px; padding: 9px 18px; font-size: 13px; }
-QPushButton:hover { background: #4040c0; }
-QPushButton#browse_btn { background: #252560; padding: 9px 12px; }
+QDialog#SetupDialog { background: #1a1a2e; }
+#SetupDialog QLabel { color: #c0c0e0; font-size: 13px; }
+#SetupDialog QLabel#title { color: #e0e0ff; font-size: 18px; font-weight: bold; }
+#SetupDialog QLineEdit { background: #16213e; color: #e0e0ff; border: 1px solid #3030a0; border-radius: 6px; padding: 8px 12px; font-size: 13px; }
+#SetupDialog QLineEdit:focus { border-color: #7070ff; }
+#SetupDialog QPushButton { background: #3030a0; color: #ffffff; border: none; border-radius: 6px; padding: 9px 18px; font-size: 13px; }
+#SetupDialog QPushButton:hover { background: #4040c0; }
+#SetupDialog QPushButton#browse_btn { background: #252560; padding: 9px 12px; }
 """
 
 
@@ -23,8 +26,9 @@ class SetupDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Initialize USB Key")
+        self.setObjectName("SetupDialog")
         self.setMinimumWidth(440)
-        self.setStyleSheet(SETUP_STYLE)
+        self._busy = False
         self._build_ui()
 
     def _build_ui(self):
@@ -65,8 +69,8 @@ class SetupDialog(QDialog):
         self.error_lbl.setStyleSheet("color: #ff5252;")
         self.error_lbl.hide()
 
-        init_btn = QPushButton("Initialize USB Key")
-        init_btn.clicked.connect(self._on_init)
+        self.init_btn = QPushButton("Initialize USB Key")
+        self.init_btn.clicked.connect(self._on_init)
 
         layout.addWidget(title)
         layout.addWidget(instructions)
@@ -78,7 +82,7 @@ class SetupDialog(QDialog):
         layout.addWidget(pw2_label)
         layout.addWidget(self.pw2_input)
         layout.addWidget(self.error_lbl)
-        layout.addWidget(init_btn)
+        layout.addWidget(self.init_btn)
 
     def _browse_usb(self):
         path = QFileDialog.getExistingDirectory(self, "Select USB Drive Root")
@@ -119,8 +123,16 @@ class SetupDialog(QDialog):
                 self._show_error("Could not delete old key file.")
                 return
 
-        recovery_code = create_usb_key(Path(usb_path), password)
+        # Key derivation + USB write are slow: run them on a pool thread
+        job = CreateKeyJob(Path(usb_path), password)
+        job.signals.finished.connect(
+            lambda recovery_code: self._on_key_created(recovery_code, key_file)
+        )
+        self._set_busy(True)
+        QThreadPool.globalInstance().start(job)
 
+    def _on_key_created(self, recovery_code: str | None, key_file: Path):
+        self._set_busy(False)
         if recovery_code:
             QMessageBox.warning(
                 self,
@@ -136,6 +148,22 @@ class SetupDialog(QDialog):
         else:
             self._show_error("Failed to write key file. Check permissions.")
 
+    def _set_busy(self, busy: bool):
+        self._busy = busy
+        self.init_btn.setEnabled(not busy)
+        if busy:
+            self.error_lbl.setStyleSheet("color: #c0c0e0;")
+            self.error_lbl.setText("Initializing…")
+            self.error_lbl.show()
+        else:
+            self.error_lbl.hide()
+
+    def reject(self):
+        # The worker reports back to this dialog; keep it open until then
+        if not self._busy:
+            super().reject()
+
     def _show_error(self, msg: str):
+        self.error_lbl.setStyleSheet("color: #ff5252;")
         self.error_lbl.setText(f"⚠ {msg}")
         self.error_lbl.show()
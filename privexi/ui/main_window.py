@@ -4,32 +4,68 @@ Main window: orchestrates login screen, vault screen, USB monitoring,
 authentication, auto-lock, and brute-force protection.
 """
 
+import hashlib
+import hmac
+import secrets
+import threading
 from pathlib import Path
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from PyQt6.QtWidgets import (
-    QMainWindow, QStackedWidget, QSystemTrayIcon, QMenu
+    QApplication, QMainWindow, QSystemTrayIcon, QMenu, QWidget
+)
+from PyQt6.QtCore import (
+    Qt, QTimer, QThreadPool, QAbstractNativeEventFilter, pyqtSignal, pyqtSlot
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSlot
 from PyQt6.QtGui import QCloseEvent, QIcon, QAction
 
 from privexi.login_screen import LoginScreen
 from privexi.vault_screen import VaultScreen
 from privexi.setup_dialog import SetupDialog
-from privexi.usb_monitor import USBMonitor
-from privexi.encryption import VaultCrypto
+from privexi.usb_monitor import USBMonitor, IS_WINDOWS
+from privexi.encryption import VaultCrypto, wipe_buffer
 from privexi.vault_manager import VaultManager
+from privexi.workers import DeriveKeyJob, VaultJob
 from privexi.security_log import log_event, log_warning, log_failure
 
+if IS_WINDOWS:
+    import ctypes.wintypes
+
 # ─── Config ────────────────────────────────────────────────────────────────────
 MAX_FAILED_ATTEMPTS = 5
 AUTO_LOCK_SECONDS = 300
 LOCKOUT_SECONDS = 30
 
-PAGE_LOGIN = 0
-PAGE_VAULT = 1
+SESSION_NONCE_SIZE = 12
+
+WM_DEVICECHANGE = 0x0219
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+
+
+class _DeviceChangeFilter(QAbstractNativeEventFilter):
+    """Windows: forwards WM_DEVICECHANGE arrival/removal to a callback."""
+
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+
+    def nativeEventFilter(self, event_type, message):
+        if bytes(event_type) == b"windows_generic_MSG":
+            msg = ctypes.wintypes.MSG.from_address(int(message))
+            if msg.message == WM_DEVICECHANGE and msg.wParam in (
+                DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE
+            ):
+                self._callback()
+        return False, 0
 
 
 class MainWindow(QMainWindow):
 
+    # Emitted from the USB monitor thread; queued onto the GUI thread
+    usb_connected = pyqtSignal(object)
+    usb_disconnected = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Privexi Secure Desktop Vault")
@@ -41,6 +77,22 @@ class MainWindow(QMainWindow):
         self._failed_attempts = 0
         self._locked_out = False
 
+        # Re-unlock cache: master key wrapped under a RAM-only session secret,
+        # so unlocking again after an auto-lock skips the full PBKDF2 run.
+        self._session_key: bytes | None = None
+        self._session_verifier: bytes | None = None
+        self._unlock_job: DeriveKeyJob | None = None
+        self._open_job: VaultJob | None = None
+
+        # Vault file operations run one at a time off the GUI thread. Locking
+        # sets _file_cancel, which stops a running encrypt/decrypt within one
+        # chunk (a secure wipe always runs to completion), and queues the key
+        # wipe behind it so the GUI never waits on file I/O.
+        self._file_pool = QThreadPool(self)
+        self._file_pool.setMaxThreadCount(1)
+        self._file_jobs: set[VaultJob] = set()
+        self._file_cancel = threading.Event()
+
         # Auto-lock timer
         self._auto_lock_timer = QTimer(self)
         self._auto_lock_timer.setSingleShot(True)
@@ -49,37 +101,30 @@ class MainWindow(QMainWindow):
             self._auto_lock_timer.setInterval(AUTO_LOCK_SECONDS * 1000)
 
         # UI
-        self._stack = QStackedWidget()
-        self.setCentralWidget(self._stack)
-
+        # Screens are swapped in as the central widget; the vault screen is
+        # only built on the first successful unlock.
+        self._current: QWidget | None = None
         self._login_screen = LoginScreen()
-        self._vault_screen = VaultScreen()
-
-        self._stack.addWidget(self._login_screen)
-        self._stack.addWidget(self._vault_screen)
+        self._vault_screen: VaultScreen | None = None
 
         self._login_screen.unlock_requested.connect(self._on_unlock_requested)
         self._login_screen.setup_requested.connect(self._on_setup_requested)
 
-        self._vault_screen.lock_requested.connect(self._lock_vault)
-        self._vault_screen.add_file_requested.connect(self._on_add_file)
-        self._vault_screen.extract_file_requested.connect(self._on_extract_file)
-        self._vault_screen.delete_file_requested.connect(self._on_delete_file)
-
         # USB monitor
+        self.usb_connected.connect(self._on_usb_connected)
+        self.usb_disconnected.connect(self._on_usb_disconnected)
         self._usb_monitor = USBMonitor(
-            on_connected=self._on_usb_connected,
-            on_disconnected=self._on_usb_disconnected,
+            on_connected=self.usb_connected.emit,
+            on_disconnected=self.usb_disconnected.emit,
         )
 
-        self._usb_check_timer = QTimer(self)
-        self._usb_check_timer.setInterval(1000)
-        self._usb_check_timer.timeout.connect(self._poll_usb)
-        self._usb_check_timer.start()
+        if IS_WINDOWS:
+            self._device_filter = _DeviceChangeFilter(self._usb_monitor.notify_device_change)
+            QApplication.instance().installNativeEventFilter(self._device_filter)
 
         self._usb_monitor.start()
 
-        self._stack.setCurrentIndex(PAGE_LOGIN)
+        self._set_page(self._login_screen)
         self._login_screen.set_usb_status(False)
 
         self._setup_tray()
@@ -106,30 +151,21 @@ class MainWindow(QMainWindow):
 
     # ─── USB ────────────────────────────────────────────────────────────────
 
-    @pyqtSlot()
-    def _poll_usb(self):
-        usb = self._usb_monitor.usb_path
-        was_connected = self._usb_path is not None
-
-        if usb and usb != self._usb_path:
-            self._usb_path = usb
-            self._on_usb_connected(usb)
-        elif not usb and was_connected:
-            self._usb_path = None
-            self._on_usb_disconnected()
-
+    @pyqtSlot(object)
     def _on_usb_connected(self, path: Path):
         self._usb_path = path
         log_event("USB_CONNECTED", f"path={path}")
         self._login_screen.set_usb_status(True)
-        if self._stack.currentIndex() == PAGE_VAULT:
+        if self._vault_visible():
             self._vault_screen.set_usb_status(True)
 
+    @pyqtSlot()
     def _on_usb_disconnected(self):
         log_warning("USB_REMOVED", "Auto-locking vault")
         self._usb_path = None
+        self._forget_session()
         self._login_screen.set_usb_status(False)
-        if self._stack.currentIndex() == PAGE_VAULT:
+        if self._vault_visible():
             self._vault_screen.set_usb_status(False)
             self._lock_vault()
 
@@ -145,9 +181,39 @@ class MainWindow(QMainWindow):
             self._login_screen.show_error("USB key not connected.")
             return
 
-        from privexi.usb_key_manager import load_usb_key
-        master_key = load_usb_key(self._usb_path, secret.strip(), is_recovery)
+        if self._unlock_job is not None or self._open_job is not None:
+            return
+
+        secret = secret.strip()
+        master_key = self._recall_session(secret, is_recovery)
+        if master_key is not None:
+            self._finish_unlock(master_key)
+            return
 
+        # PBKDF2 takes hundreds of ms: derive on a pool thread
+        job = DeriveKeyJob(secret, is_recovery, self._usb_path)
+        job.signals.finished.connect(
+            lambda key: self._on_key_derived(key, secret, is_recovery)
+        )
+        self._unlock_job = job
+        self._login_screen.set_busy(True)
+        QThreadPool.globalInstance().start(job)
+
+    def _on_key_derived(self, master_key: bytearray | None, secret: str, is_recovery: bool):
+        self._unlock_job = None
+        self._login_screen.set_busy(False)
+
+        if master_key and not self._usb_path:
+            # USB was removed while the key was being derived
+            wipe_buffer(master_key)
+            self._login_screen.show_error("USB key not connected.")
+            return
+
+        if master_key:
+            self._remember_session(secret, is_recovery, master_key)
+        self._finish_unlock(master_key)
+
+    def _finish_unlock(self, master_key: bytearray | None):
         if not master_key:
             self._failed_attempts += 1
             remaining = MAX_FAILED_ATTEMPTS - self._failed_attempts
@@ -167,15 +233,63 @@ class MainWindow(QMainWindow):
         log_event("AUTH_SUCCESS")
 
         crypto = VaultCrypto(master_key)
-        for i in range(len(master_key)):
-            master_key[i] = 0
-
-        self._vault_manager = VaultManager(crypto)
+        wipe_buffer(master_key)
         self._login_screen.clear_password()
+
+        # The index is opened on the file worker, queued behind whatever the
+        # previous session left running (a cancelled add or delete may still
+        # be wiping a file, then its compaction runs), so the GUI never waits.
+        self._file_cancel = threading.Event()
+        job = VaultJob(VaultManager, crypto)
+        job.signals.finished.connect(self._on_vault_opened)
+        self._open_job = job
+        self._login_screen.set_busy(True)
+        self._file_pool.start(job)
+
+    def _on_vault_opened(self, manager: VaultManager | None):
+        self._open_job = None
+        self._login_screen.set_busy(False)
+        if manager is None:
+            self._login_screen.show_error("Could not open the vault.")
+            return
+        if not self._usb_path:
+            # USB was removed while the index was loading
+            self._file_pool.start(VaultJob(manager.lock))
+            self._login_screen.show_error("USB key not connected.")
+            return
+        self._vault_manager = manager
         self._switch_to_vault()
 
+    def _session_wrap_key(self, secret: str, is_recovery: bool) -> bytes:
+        label = b"recovery:" if is_recovery else b"password:"
+        return hmac.new(self._session_key, label + secret.encode("utf-8"), hashlib.sha256).digest()
+
+    def _remember_session(self, secret: str, is_recovery: bool, master_key: bytearray):
+        self._session_key = secrets.token_bytes(32)
+        nonce = secrets.token_bytes(SESSION_NONCE_SIZE)
+        aead = AESGCM(self._session_wrap_key(secret, is_recovery))
+        self._session_verifier = nonce + aead.encrypt(nonce, bytes(master_key), None)
+
+    def _recall_session(self, secret: str, is_recovery: bool) -> bytearray | None:
+        """Return the cached master key if secret matches the last unlock."""
+        if self._session_key is None or self._session_verifier is None:
+            return None
+        nonce = self._session_verifier[:SESSION_NONCE_SIZE]
+        ciphertext = self._session_verifier[SESSION_NONCE_SIZE:]
+        try:
+            aead = AESGCM(self._session_wrap_key(secret, is_recovery))
+            return bytearray(aead.decrypt(nonce, ciphertext, None))
+        except InvalidTag:
+            # Wrong secret: fall through to the full key derivation
+            return None
+
+    def _forget_session(self):
+        self._session_key = None
+        self._session_verifier = None
+
     def _trigger_lockout(self):
         self._locked_out = True
+        self._forget_session()
         log_failure("AUTH_LOCKOUT", f"duration={LOCKOUT_SECONDS}s")
         self._login_screen.show_error(f"Locked for {LOCKOUT_SECONDS}s.")
         QTimer.singleShot(LOCKOUT_SECONDS * 1000, self._end_lockout)
@@ -188,28 +302,49 @@ class MainWindow(QMainWindow):
 
     # ─── Vault ────────────────────────────────────────────────────────────────
 
+    def _set_page(self, page: QWidget):
+        if page is self._current:
+            return
+        if self._current is not None:
+            self._current.hide()
+            # Reclaim ownership: setCentralWidget would delete the old widget
+            self.takeCentralWidget()
+        self.setCentralWidget(page)
+        page.show()
+        self._current = page
+
+    def _vault_visible(self) -> bool:
+        return self._vault_screen is not None and self._current is self._vault_screen
+
+    def _build_vault_screen(self):
+        self._vault_screen = VaultScreen()
+        self._vault_screen.lock_requested.connect(self._lock_vault)
+        self._vault_screen.add_file_requested.connect(self._on_add_file)
+        self._vault_screen.extract_file_requested.connect(self._on_extract_file)
+        self._vault_screen.delete_file_requested.connect(self._on_delete_file)
+
     def _switch_to_vault(self):
+        if self._vault_screen is None:
+            self._build_vault_screen()
         self._refresh_file_list()
         self._vault_screen.set_usb_status(True)
-        self._stack.setCurrentIndex(PAGE_VAULT)
+        self._set_page(self._vault_screen)
         self._auto_lock_timer.start()
 
     def _refresh_file_list(self):
-        if self._vault_manager:
+        if self._vault_manager and self._vault_screen is not None:
             self._vault_screen.populate_files(self._vault_manager.list_files())
 
     def _reset_auto_lock_timer(self):
-        if self._stack.currentIndex() == PAGE_VAULT:
+        if self._vault_visible():
             self._auto_lock_timer.start()
 
     @pyqtSlot()
     def _lock_vault(self):
         self._auto_lock_timer.stop()
-        if self._vault_manager:
-            self._vault_manager.lock()
-            self._vault_manager = None
+        self._close_vault_manager()
         log_event("VAULT_LOCKED")
-        self._stack.setCurrentIndex(PAGE_LOGIN)
+        self._set_page(self._login_screen)
         self._login_screen.set_usb_status(self._usb_path is not None)
 
     @pyqtSlot()
@@ -219,36 +354,95 @@ class MainWindow(QMainWindow):
 
     # ─── File Ops ──────────────────────────────────────────────────────────────
 
+    def _start_file_job(self, status: str, on_done, op, *args):
+        job = VaultJob(op, *args)
+        job.signals.finished.connect(lambda result: self._on_file_job_done(job, on_done, result))
+        self._file_jobs.add(job)
+        self._vault_screen.set_status(status)
+        self._file_pool.start(job)
+
+    def _on_file_job_done(self, job: VaultJob, on_done, result):
+        if job not in self._file_jobs:
+            return  # vault was locked while the job ran
+        self._file_jobs.discard(job)
+        self._reset_auto_lock_timer()
+        on_done(result)
+
+    def _close_vault_manager(self):
+        """Cancel file jobs and wipe the key once the running one has stopped."""
+        manager, self._vault_manager = self._vault_manager, None
+        if manager is None:
+            return
+        self._file_cancel.set()
+        self._file_pool.clear()
+        self._file_jobs.clear()
+        # Same single worker: runs right after a cancelled job returns
+        self._file_pool.start(VaultJob(manager.lock))
+
     @pyqtSlot(Path)
     def _on_add_file(self, path: Path):
         self._reset_auto_lock_timer()
-        if self._vault_manager and self._vault_manager.add_file(path, True):
+        if self._vault_manager:
+            self._start_file_job(
+                f"Adding {path.name}…",
+                lambda ok: self._on_file_added(path, ok),
+                self._vault_manager.add_file, path, True, self._file_cancel,
+            )
+
+    def _on_file_added(self, path: Path, ok: bool | None):
+        if ok:
             self._refresh_file_list()
+            self._vault_screen.set_status(f"Added {path.name}", "#00e676")
+        else:
+            self._vault_screen.set_status(f"Could not add {path.name}", "#ff5252")
 
     @pyqtSlot(str, Path)
     def _on_extract_file(self, vault_id: str, dest: Path):
         self._reset_auto_lock_timer()
         if self._vault_manager:
-            self._vault_manager.extract_file(vault_id, dest)
+            self._start_file_job(
+                "Extracting…", self._on_file_extracted,
+                self._vault_manager.extract_file, vault_id, dest, self._file_cancel,
+            )
+
+    def _on_file_extracted(self, out_path: Path | None):
+        if out_path:
+            self._vault_screen.set_status(f"Extracted to {out_path}", "#00e676")
+        else:
+            self._vault_screen.set_status("Extraction failed", "#ff5252")
 
     @pyqtSlot(str)
     def _on_delete_file(self, vault_id: str):
         self._reset_auto_lock_timer()
-        if self._vault_manager and self._vault_manager.delete_file(vault_id):
+        if self._vault_manager:
+            self._start_file_job(
+                "Deleting…", self._on_file_deleted,
+                self._vault_manager.delete_file, vault_id,
+            )
+
+    def _on_file_deleted(self, ok: bool | None):
+        if ok:
             self._refresh_file_list()
+            self._vault_screen.set_status("File deleted", "#00e676")
+        else:
+            self._vault_screen.set_status("Could not delete file", "#ff5252")
 
     # ─── Setup ────────────────────────────────────────────────────────────────
 
     @pyqtSlot()
     def _on_setup_requested(self):
+        # The dialog may replace the key file; a cached unlock would outlive it
+        self._forget_session()
         SetupDialog(self).exec()
 
     # ─── Window Events ────────────────────────────────────────────────────────
 
     def closeEvent(self, event: QCloseEvent):
-        self._usb_check_timer.stop()
         self._usb_monitor.stop()
-        if self._vault_manager:
-            self._vault_manager.lock()
+        self._forget_session()
+        self._close_vault_manager()
+        # The only blocking wait: let a running job (possibly a secure wipe),
+        # the key wipe and index compaction complete before exit
+        self._file_pool.waitForDone()
         log_event("APP_CLOSED")
         event.accept()
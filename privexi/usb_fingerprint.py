@@ -5,6 +5,8 @@ Linux: pyudev
 Windows: pywin32 / WMI
 """
 
+import os
+import re
 import sys
 import hashlib
 from pathlib import Path
@@ -28,17 +30,17 @@ def get_usb_fingerprint(usb_path: Path) -> str:
 
 
 def _linux_usb_fingerprint(usb_path: Path) -> str:
-    import pyudev, os
+    import pyudev
     context = pyudev.Context()
-    # Find the device node for the mount point
-    mount_path = os.path.realpath(str(usb_path))
+    # Find the device node for the mount point. The kernel already lists
+    # canonical mount paths, so only usb_path needs resolving.
+    mount_path = os.fsencode(os.path.realpath(str(usb_path)))
     device_node = None
-    with open('/proc/mounts', 'r') as f:
-        for line in f:
-            parts = line.split()
-            if len(parts) >= 2 and os.path.realpath(parts[1]) == mount_path:
-                device_node = parts[0]
-                break
+    for line in Path('/proc/mounts').read_bytes().splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and _unescape_mount_field(parts[1]) == mount_path:
+            device_node = os.fsdecode(parts[0])
+            break
     if not device_node:
         raise RuntimeError(f"Could not find device node for mount point: {usb_path}")
     # Remove partition number (e.g., /dev/sdb1 -> /dev/sdb)
@@ -61,6 +63,13 @@ def _linux_usb_fingerprint(usb_path: Path) -> str:
     return hashlib.sha256(fingerprint_data.encode()).hexdigest()
 
 
+def _unescape_mount_field(field: bytes) -> bytes:
+    """Undo /proc/mounts octal escapes (e.g. b'\\040' for a space)."""
+    if b'\\' not in field:
+        return field
+    return re.sub(rb'\\([0-7]{3})', lambda m: bytes([int(m.group(1), 8)]), field)
+
+
 def _windows_usb_fingerprint(usb_path: Path) -> str:
     try:
         import win32com.client
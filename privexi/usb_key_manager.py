@@ -1,47 +1,60 @@
 import os
+import base64
+import hmac
+import logging
 import secrets
+import struct
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
+
+from privexi.encryption import derive_key
 
 KEY_FILE_NAME = ".vault.key"
 
-VERSION = b"\x03"
+VERSION = b"\x04"
 VERSION_SIZE = 1
 
+# PBKDF2 PRF per key-file version; v3 files keep deriving with SHA-256
+KDF_HASH_BY_VERSION = {
+    b"\x03": "sha256",
+    b"\x04": "sha512",
+}
+
 SALT_SIZE = 32
 AES_KEY_SIZE = 32
 TAG_SIZE = 32
 NONCE_SIZE = 12
 PBKDF2_ITERATIONS = 480_000
+RECOVERY_CODE_BYTES = 10  # 80 bits -> 16 Base32 characters
 
+# version || salt_pw || salt_recovery || nonce || len(ct_pw), then ct_pw || ct_recovery
+_HEADER = struct.Struct(f">c{SALT_SIZE}s{SALT_SIZE}s{NONCE_SIZE}sH")
 
-def derive_key(secret: str, salt: bytes) -> bytes:
-    return PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=AES_KEY_SIZE,
-        salt=salt,
-        iterations=PBKDF2_ITERATIONS,
-        backend=default_backend(),
-    ).derive(secret.encode())
+log = logging.getLogger(__name__)
 
 
 def create_usb_key(usb_path: Path, password: str) -> str | None:
     try:
-        print("[DEBUG] Creating key on USB:", usb_path)
-
-        salt_pw = secrets.token_bytes(SALT_SIZE)
-        salt_recovery = secrets.token_bytes(SALT_SIZE)
-        nonce = secrets.token_bytes(NONCE_SIZE)
-
-        master_key = secrets.token_bytes(AES_KEY_SIZE)
-        recovery_code = secrets.token_urlsafe(12)[:16].upper()
-
-        key_pw = derive_key(password, salt_pw)
-        key_recovery = derive_key(recovery_code, salt_recovery)
+        log.debug("Creating key on USB: %s", usb_path)
+
+        # One CSPRNG draw, sliced into salts, nonce and master key
+        rnd = secrets.token_bytes(2 * SALT_SIZE + NONCE_SIZE + AES_KEY_SIZE)
+        salt_pw = rnd[:SALT_SIZE]
+        salt_recovery = rnd[SALT_SIZE:2 * SALT_SIZE]
+        nonce = rnd[2 * SALT_SIZE:2 * SALT_SIZE + NONCE_SIZE]
+        master_key = rnd[2 * SALT_SIZE + NONCE_SIZE:]
+        recovery_code = base64.b32encode(
+            secrets.token_bytes(RECOVERY_CODE_BYTES)
+        ).decode("ascii").rstrip("=")
+
+        # PBKDF2 releases the GIL, so the two derivations run on separate cores
+        kdf_hash = KDF_HASH_BY_VERSION[VERSION]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            f_pw = pool.submit(derive_key, password, salt_pw, kdf_hash)
+            f_recovery = pool.submit(derive_key, recovery_code, salt_recovery, kdf_hash)
+            key_pw, key_recovery = f_pw.result(), f_recovery.result()
 
         aes_pw = AESGCM(key_pw)
         aes_recovery = AESGCM(key_recovery)
@@ -50,19 +63,15 @@ def create_usb_key(usb_path: Path, password: str) -> str | None:
         ct_pw = aes_pw.encrypt(nonce, payload, salt_pw)
         ct_recovery = aes_recovery.encrypt(nonce, payload, salt_recovery)
 
-        blob = (
-            VERSION +
-            salt_pw +
-            salt_recovery +
-            nonce +
-            len(ct_pw).to_bytes(2, "big") +
-            ct_pw +
-            ct_recovery
-        )
+        blob = b"".join([
+            _HEADER.pack(VERSION, salt_pw, salt_recovery, nonce, len(ct_pw)),
+            ct_pw,
+            ct_recovery,
+        ])
 
         key_file = usb_path / KEY_FILE_NAME
         key_file.write_bytes(blob)
-        print("[DEBUG] Key file written:", key_file)
+        log.debug("Key file written: %s", key_file)
 
         if os.name == "nt":
             import ctypes
@@ -71,55 +80,46 @@ def create_usb_key(usb_path: Path, password: str) -> str | None:
         return recovery_code
 
     except Exception as e:
-        print("[DEBUG] ❌ create_usb_key error:", repr(e))
+        log.warning("create_usb_key error: %r", e)
         return None
 
 
 def load_usb_key(usb_path: Path, secret: str, is_recovery: bool) -> bytearray | None:
     key_file = usb_path / KEY_FILE_NAME
-    print("[DEBUG] USB path:", usb_path)
-    print("[DEBUG] Looking for key file:", key_file)
+    log.debug("Looking for key file: %s", key_file)
 
     if not key_file.exists():
-        print("[DEBUG] ❌ Key file not found")
+        log.debug("Key file not found")
         return None
 
     try:
         data = key_file.read_bytes()
-        version = data[0:1]
+        version, salt_pw, salt_recovery, nonce, ct_len = _HEADER.unpack_from(data)
 
-        if version != VERSION:
-            print("[DEBUG] ❌ Version mismatch")
+        kdf_hash = KDF_HASH_BY_VERSION.get(version)
+        if kdf_hash is None:
+            log.debug("Unsupported key file version %r", version)
             return None
 
-        off = 1
-        salt_pw = data[off:off + SALT_SIZE]
-        off += SALT_SIZE
-        salt_recovery = data[off:off + SALT_SIZE]
-        off += SALT_SIZE
-        nonce = data[off:off + NONCE_SIZE]
-        off += NONCE_SIZE
-
-        ct_len = int.from_bytes(data[off:off + 2], "big")
-        off += 2
+        off = _HEADER.size
         ct_pw = data[off:off + ct_len]
         ct_recovery = data[off + ct_len:]
 
         salt = salt_recovery if is_recovery else salt_pw
         ciphertext = ct_recovery if is_recovery else ct_pw
 
-        key = derive_key(secret, salt)
+        key = derive_key(secret, salt, kdf_hash)
         aesgcm = AESGCM(key)
 
         payload = aesgcm.decrypt(nonce, ciphertext, salt)
-        if not payload.startswith(VERSION):
-            print("[DEBUG] ❌ Payload version mismatch")
+        if not hmac.compare_digest(payload[:VERSION_SIZE], version):
+            log.debug("Payload version mismatch")
             return None
 
         master_key = payload[1:1 + AES_KEY_SIZE]
-        print("[DEBUG] ✅ Vault unlocked")
+        log.debug("Vault unlocked")
         return bytearray(master_key)
 
     except Exception as e:
-        print("[DEBUG] ❌ load_usb_key error:", repr(e))
+        log.debug("load_usb_key error: %r", e)
         return None
@@ -2,13 +2,14 @@
 modules/usb_monitor.py
 Cross-platform USB detection and monitoring.
 Linux:   pyudev
-Windows: win32api / wmic fallback
+Windows: kernel32 GetLogicalDrives / GetDriveTypeW (ctypes)
 """
 
+import ctypes
 import os
+import select
 import sys
 import threading
-import time
 from pathlib import Path
 from typing import Callable, Optional
 
@@ -23,6 +24,8 @@ from privexi.usb_key_manager import KEY_FILE_NAME
 IS_LINUX = sys.platform.startswith("linux")
 IS_WINDOWS = sys.platform == "win32"
 
+DRIVE_REMOVABLE = 2  # GetDriveTypeW
+
 
 def find_usb_with_key() -> Optional[Path]:
     """
@@ -31,16 +34,26 @@ def find_usb_with_key() -> Optional[Path]:
     """
     candidates = _get_removable_drives()
     for drive in candidates:
-        # Check for .vault.key at root (legacy) or inside .SystemCache (current)
-        key_path_legacy = drive / KEY_FILE_NAME
-        key_path_hidden = drive / KEY_FILE_NAME
-        if key_path_hidden.exists() or key_path_legacy.exists():
+        if (drive / KEY_FILE_NAME).exists():
             return drive
     return None
 
 
 # ─── Drive Enumeration ─────────────────────────────────────────────────────────
 
+# /proc/mounts content -> drive list from the last scan
+_linux_drive_cache: tuple[bytes, list[Path]] = (b"", [])
+# device node -> removable flag; never changes for a given node
+_linux_removable_cache: dict[str, bool] = {}
+# drive root -> GetDriveType result, cleared on WM_DEVICECHANGE
+_windows_drive_type_cache: dict[str, int] = {}
+
+
+def invalidate_drive_cache():
+    """Forget cached drive types after the OS reports a device change."""
+    _windows_drive_type_cache.clear()
+
+
 def _get_removable_drives() -> list[Path]:
     """Return list of mounted removable drive root paths."""
     if IS_LINUX:
@@ -55,25 +68,32 @@ def _linux_removable_drives() -> list[Path]:
     """
     On Linux, check /proc/mounts for removable block devices.
     Also checks common USB mount points.
+    The result is reused until the mount table changes (procfs has no
+    meaningful mtime, so the raw table is compared instead).
     """
+    global _linux_drive_cache
     drives = []
     common_mount_dirs = [Path("/media"), Path("/run/media"), Path("/mnt")]
 
-    # Parse /proc/mounts for mounted partitions
     try:
-        with open("/proc/mounts", "r") as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                device, mount_point = parts[0], parts[1]
-                mount = Path(mount_point)
-
-                # Check if this mount looks like a USB/removable device
-                if _is_linux_removable(device, mount):
-                    drives.append(mount)
+        with open("/proc/mounts", "rb") as f:
+            table = f.read()
     except Exception:
-        pass
+        table = b""
+    if table and table == _linux_drive_cache[0]:
+        return list(_linux_drive_cache[1])
+
+    # Parse /proc/mounts for mounted partitions
+    for line in table.decode(errors="replace").splitlines():
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        device, mount_point = parts[0], parts[1]
+        mount = Path(mount_point)
+
+        # Check if this mount looks like a USB/removable device
+        if _is_linux_removable(device, mount):
+            drives.append(mount)
 
     # Also scan common user-mount directories
     for base in common_mount_dirs:
@@ -82,61 +102,48 @@ def _linux_removable_drives() -> list[Path]:
                 if sub.is_dir() and sub not in drives:
                     drives.append(sub)
 
-    return drives
+    if table:
+        _linux_drive_cache = (table, drives)
+    return list(drives)
 
 
 def _is_linux_removable(device: str, mount_point: Path) -> bool:
     """Heuristic: check if a Linux device is removable."""
     if not device.startswith("/dev/"):
         return False
+    cached = _linux_removable_cache.get(device)
+    if cached is not None:
+        return cached
     # Strip partition number to get base device (sdb1 -> sdb)
     base = device.replace("/dev/", "")
     base = base.rstrip("0123456789")
     removable_path = Path(f"/sys/block/{base}/removable")
     try:
-        return removable_path.read_text().strip() == "1"
+        removable = removable_path.read_text().strip() == "1"
     except Exception:
-        return False
+        removable = False
+    _linux_removable_cache[device] = removable
+    return removable
 
 
 def _windows_removable_drives() -> list[Path]:
-    """Enumerate removable drives on Windows using win32api."""
-    drives = []
-    try:
-        import win32api
-        import win32con
-        all_drives = win32api.GetLogicalDriveStrings().split("\x00")
-        for drive in all_drives:
-            if not drive:
-                continue
-            try:
-                drive_type = win32api.GetDriveType(drive)
-                # DRIVE_REMOVABLE = 2
-                if drive_type == 2:
-                    drives.append(Path(drive))
-            except Exception:
-                pass
-    except ImportError:
-        # Fallback: try wmic
-        drives = _windows_wmic_drives()
-    return drives
-
-
-def _windows_wmic_drives() -> list[Path]:
-    """Fallback Windows drive detection using wmic."""
-    import subprocess
+    """Enumerate removable drives on Windows via kernel32."""
     drives = []
     try:
-        result = subprocess.run(
-            ["wmic", "logicaldisk", "where", "drivetype=2", "get", "deviceid"],
-            capture_output=True, text=True, timeout=5
-        )
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if len(line) == 2 and line[1] == ":":
-                drives.append(Path(line + "\\"))
+        kernel32 = ctypes.windll.kernel32
+        mask = kernel32.GetLogicalDrives()
     except Exception:
-        pass
+        return drives
+    for i in range(26):
+        if not mask & (1 << i):
+            continue
+        drive = f"{chr(65 + i)}:\\"
+        drive_type = _windows_drive_type_cache.get(drive)
+        if drive_type is None:
+            drive_type = kernel32.GetDriveTypeW(drive)
+            _windows_drive_type_cache[drive] = drive_type
+        if drive_type == DRIVE_REMOVABLE:
+            drives.append(Path(drive))
     return drives
 
 
@@ -155,11 +162,18 @@ def _fallback_drives() -> list[Path]:
 
 class USBMonitor(threading.Thread):
     """
-    Background thread that polls for USB key presence every second.
-    Calls on_connected(path) and on_disconnected() callbacks.
+    Background thread that rescans for the USB key whenever the OS reports a
+    device change, instead of polling:
+      Linux:   udev block events + mount table changes (pyudev)
+      Windows: WM_DEVICECHANGE, forwarded by the GUI via notify_device_change()
+    A slow SAFETY_POLL_INTERVAL rescan catches any event that was missed.
+    Without an event source it falls back to polling every POLL_INTERVAL.
+    Calls on_connected(path) and on_disconnected() callbacks from this thread.
     """
 
-    POLL_INTERVAL = 1.0  # seconds
+    POLL_INTERVAL = 1.0  # seconds, fallback only
+    SAFETY_POLL_INTERVAL = 5.0  # seconds, with an event source
+    CONNECT_DEBOUNCE = 0.3  # seconds a new key drive must stay put
 
     def __init__(
         self,
@@ -170,21 +184,102 @@ class USBMonitor(threading.Thread):
         self._on_connected = on_connected
         self._on_disconnected = on_disconnected
         self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._wake_pipe: Optional[tuple[int, int]] = None
+        if IS_LINUX:
+            self._wake_pipe = os.pipe()
+            os.set_blocking(self._wake_pipe[1], False)
         self._current_usb: Optional[Path] = None
 
     def run(self):
+        wait = self._linux_event_wait() if IS_LINUX else None
+        if wait is None:
+            wait = self._wake_wait
         while not self._stop_event.is_set():
-            usb = find_usb_with_key()
-            if usb and usb != self._current_usb:
-                self._current_usb = usb
-                self._on_connected(usb)
-            elif not usb and self._current_usb is not None:
-                self._current_usb = None
-                self._on_disconnected()
-            time.sleep(self.POLL_INTERVAL)
+            self._scan()
+            wait()
+
+    def _scan(self):
+        usb = find_usb_with_key()
+        # Sticks often drop and re-enumerate while mounting; only report a
+        # drive once it is still there after CONNECT_DEBOUNCE
+        while usb and usb != self._current_usb:
+            if self._stop_event.wait(self.CONNECT_DEBOUNCE):
+                return
+            settled = find_usb_with_key()
+            if settled == usb:
+                break
+            usb = settled
+        if usb and usb != self._current_usb:
+            self._current_usb = usb
+            self._on_connected(usb)
+        elif not usb and self._current_usb is not None:
+            self._current_usb = None
+            self._on_disconnected()
+
+    def _wake_wait(self):
+        # Windows is woken by notify_device_change(); other platforms poll
+        self._wake_event.wait(
+            self.SAFETY_POLL_INTERVAL if IS_WINDOWS else self.POLL_INTERVAL
+        )
+        self._wake_event.clear()
+
+    def _linux_event_wait(self) -> Optional[Callable[[], None]]:
+        """Return a blocking wait on udev block events and mount table changes."""
+        try:
+            import pyudev
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by(subsystem="block")
+            monitor.start()
+            mounts = open("/proc/self/mounts", "rb")
+        except Exception:
+            return None
+
+        wake_fd = self._wake_pipe[0]
+        poller = select.poll()
+        poller.register(monitor.fileno(), select.POLLIN)
+        # The kernel raises POLLPRI on this file whenever the mount table changes;
+        # keys only become visible once the automounter has mounted the drive.
+        poller.register(mounts.fileno(), select.POLLPRI)
+        poller.register(wake_fd, select.POLLIN)
+
+        timeout_ms = int(self.SAFETY_POLL_INTERVAL * 1000)
+
+        def wait():
+            # Block until a device is added/removed, the mount table changes,
+            # we are woken, or the safety interval elapses
+            while True:
+                ready = poller.poll(timeout_ms)
+                if not ready:
+                    return
+                rescan = False
+                for fd, _ in ready:
+                    if fd == monitor.fileno():
+                        for device in iter(lambda: monitor.poll(timeout=0), None):
+                            if device.action in ("add", "remove"):
+                                rescan = True
+                    else:
+                        if fd == wake_fd:
+                            os.read(wake_fd, 64)
+                        rescan = True
+                if rescan:
+                    return
+
+        return wait
+
+    def notify_device_change(self):
+        """Ask the monitor to rescan drives. Safe to call from any thread."""
+        invalidate_drive_cache()
+        self._wake_event.set()
+        if self._wake_pipe is not None:
+            try:
+                os.write(self._wake_pipe[1], b"\0")
+            except BlockingIOError:
+                pass  # a wake-up is already pending
 
     def stop(self):
         self._stop_event.set()
+        self.notify_device_change()
 
     @property
     def usb_path(self) -> Optional[Path]:
@@ -2,11 +2,20 @@
 modules/vault_manager.py
 Manages the encrypted file vault: add, list, extract, delete vault entries.
 Each file is stored as:  <vault_dir>/<sha256_of_original_name>.enc
+(chunked AES-GCM, streamed so large files never sit in memory whole)
 An encrypted index maps original filenames -> vault filenames.
+Index changes are appended to an encrypted journal and folded back into
+the index snapshot on lock, or once the journal outgrows the snapshot.
 """
 
+import hmac
 import json
+import logging
+import mmap
 import os
+import secrets
+import struct
+import threading
 import time
 import hashlib
 from pathlib import Path
@@ -14,34 +23,75 @@ from typing import Optional
 
 from privexi.encryption import (
     VaultCrypto,
+    OperationCancelled,
     VAULT_DIR,
     VAULT_INDEX,
+    VAULT_JOURNAL,
     secure_delete,
     ensure_vault_dir,
-    get_file_integrity_hash,
+    new_integrity_hasher,
+    INTEGRITY_ALGO,
 )
 
 
 # ─── Index Format ──────────────────────────────────────────────────────────────
-# The index is an encrypted JSON dict:
-# {
+# The index snapshot is an encrypted JSON dict:
+# {"generation": "<hex>", "entries": {
 #   "vault_id": {
 #     "original_name": "document.pdf",
 #     "vault_file": "a3f2c1....enc",
 #     "added_at": 1700000000.0,
 #     "size_bytes": 12345,
-#     "sha256": "abc123..."
+#     "hash_algo": "blake3",
+#     "digest": "abc123..."
 #   },
 #   ...
-# }
+# }}
+# Snapshots from older versions are the bare "entries" dict.
+# Entries from older versions have "sha256": "<hex>" instead of hash_algo/digest.
+#
+# The journal starts with the snapshot's generation id, followed by records,
+# each a 4-byte big-endian length and an encrypted JSON change:
+#   {"op": "add", "vault_id": "...", "meta": {...}}
+#   {"op": "del", "vault_id": "..."}
+# Record n is sealed with AAD = generation || n, so records cannot be dropped,
+# reordered or carried over from another journal without failing to decrypt.
+# Replaying it over the snapshot gives the current index. A journal whose
+# generation is not the snapshot's was already folded into the snapshot.
+
+_RECORD_LEN = struct.Struct(">I")
+_RECORD_SEQ = struct.Struct(">Q")
+GENERATION_SIZE = 16
+JOURNAL_COMPACT_MIN = 64 * 1024  # don't compact journals smaller than this
+
+log = logging.getLogger(__name__)
+
+
+def _entry_digest(meta: dict) -> tuple[str, str]:
+    """(hash algorithm, expected hex digest) for an index entry."""
+    if "hash_algo" in meta:
+        return meta["hash_algo"], meta.get("digest", "")
+    return "sha256", meta.get("sha256", "")
 
 
 class VaultManager:
-    """High-level API for interacting with the encrypted vault."""
+    """
+    High-level API for interacting with the encrypted vault.
+    File operations may run on a worker thread while the GUI thread lists
+    files; _index_lock guards every read and write of the index.
+    """
 
     def __init__(self, crypto: VaultCrypto):
         self._crypto = crypto
         ensure_vault_dir()
+        self._snapshot_size = 0
+        self._generation: bytes | None = None
+        self._journal_size = 0
+        self._journal_seq = 0
+        # Set when the index could not be read in full; writing then would
+        # discard the unreadable part, so the vault is kept read-only
+        self._damaged = False
+        self._index_lock = threading.RLock()
         self._index: dict = self._load_index()
 
     # ─── Index ─────────────────────────────────────────────────────────────────
@@ -50,26 +100,145 @@ class VaultManager:
         return VAULT_INDEX
 
     def _load_index(self) -> dict:
-        """Load and decrypt the vault index. Returns empty dict if missing."""
+        """Load the vault index snapshot and replay the journal over it."""
+        index = self._load_snapshot()
+        self._replay_journal(index)
+        return index
+
+    def _load_snapshot(self) -> dict:
+        """Load and decrypt the index snapshot. Returns empty dict if missing."""
         idx_path = self._index_path()
         if not idx_path.exists():
             return {}
         try:
-            ciphertext = idx_path.read_bytes()
-            plaintext = self._crypto.decrypt_file(ciphertext)
+            with open(idx_path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self._snapshot_size = len(mm)
+                plaintext = self._crypto.decrypt_file(mm)
             if plaintext is None:
-                print("[VAULT] Warning: Could not decrypt index (wrong key?)")
+                log.warning("Could not decrypt index (wrong key?)")
+                self._damaged = True
                 return {}
-            return json.loads(plaintext.decode("utf-8"))
+            snapshot = json.loads(plaintext.decode("utf-8"))
         except Exception as e:
-            print(f"[VAULT] Index load error: {e}")
+            log.error("Index load error: %s", e)
+            self._damaged = True
             return {}
+        if "generation" in snapshot and "entries" in snapshot:
+            self._generation = bytes.fromhex(snapshot["generation"])
+            return snapshot["entries"]
+        return snapshot
+
+    def _record_aad(self, seq: int) -> bytes:
+        return self._generation + _RECORD_SEQ.pack(seq)
+
+    def _replay_journal(self, index: dict):
+        """Apply journal records to index, stopping at the first bad record."""
+        try:
+            data = VAULT_JOURNAL.read_bytes()
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            log.error("Journal load error: %s", e)
+            self._damaged = True
+            return
+
+        if len(data) < GENERATION_SIZE:
+            return  # torn header; nothing was journalled yet
+        if self._generation is None:
+            log.error("Journal %s has no matching index snapshot", VAULT_JOURNAL)
+            self._damaged = True
+            return
+        if not hmac.compare_digest(data[:GENERATION_SIZE], self._generation):
+            return  # left over from before the last compaction
+
+        view = memoryview(data)
+        pos = GENERATION_SIZE
+        seq = 0
+        while pos + _RECORD_LEN.size <= len(view):
+            (length,) = _RECORD_LEN.unpack_from(view, pos)
+            end = pos + _RECORD_LEN.size + length
+            if end > len(view):
+                break  # torn write at the tail
+            plaintext = self._crypto.decrypt_file(
+                view[pos + _RECORD_LEN.size:end], self._record_aad(seq)
+            )
+            try:
+                record = json.loads(plaintext.decode("utf-8"))
+                op, vault_id = record["op"], record["vault_id"]
+                if op == "add":
+                    index[vault_id] = record["meta"]
+                elif op == "del":
+                    index.pop(vault_id, None)
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+            except Exception:
+                log.error("Journal record %d at offset %d is unreadable; "
+                          "vault is read-only until %s is repaired", seq, pos, VAULT_JOURNAL)
+                self._damaged = True
+                return
+            pos = end
+            seq += 1
+        if pos < len(view):
+            log.warning("Ignoring %d trailing journal bytes", len(view) - pos)
+        self._journal_size = pos
+        self._journal_seq = seq
+
+    def _check_writable(self):
+        if self._damaged:
+            raise RuntimeError("vault index is damaged; refusing to modify it")
+
+    def _append_journal(self, record: dict):
+        """Record one index change, compacting once the journal grows large."""
+        self._check_writable()
+        if self._generation is None:
+            # No generation to bind records to yet: write a snapshot instead
+            self._save_index()
+            return
+
+        plaintext = json.dumps(
+            record, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        ciphertext = self._crypto.encrypt_file(plaintext, self._record_aad(self._journal_seq))
+        with open(VAULT_JOURNAL, "ab") as f:
+            if f.tell() != self._journal_size:
+                # Drop a torn record (or a stale journal) past the last good one
+                f.truncate(self._journal_size)
+            if self._journal_size == 0:
+                f.write(self._generation)
+                self._journal_size = GENERATION_SIZE
+            f.write(_RECORD_LEN.pack(len(ciphertext)) + ciphertext)
+        self._journal_size += _RECORD_LEN.size + len(ciphertext)
+        self._journal_seq += 1
+
+        if (self._journal_size > JOURNAL_COMPACT_MIN
+                and self._journal_size > 2 * self._snapshot_size):
+            try:
+                self._save_index()
+            except Exception as e:
+                # The change is already journalled; compaction can wait
+                log.error("Index compaction error: %s", e)
 
     def _save_index(self):
-        """Encrypt and write the vault index."""
-        plaintext = json.dumps(self._index, indent=2).encode("utf-8")
+        """Encrypt and write a full index snapshot, then clear the journal."""
+        self._check_writable()
+        generation = secrets.token_bytes(GENERATION_SIZE)
+        plaintext = json.dumps(
+            {"generation": generation.hex(), "entries": self._index},
+            separators=(",", ":"), ensure_ascii=False,
+        ).encode("utf-8")
         ciphertext = self._crypto.encrypt_file(plaintext)
-        self._index_path().write_bytes(ciphertext)
+        idx_path = self._index_path()
+        tmp_path = idx_path.with_name(idx_path.name + ".tmp")
+        tmp_path.write_bytes(ciphertext)
+        os.replace(tmp_path, idx_path)
+        # A journal that survives a crash here carries the old generation and
+        # is skipped on the next load; the snapshot already holds its changes
+        VAULT_JOURNAL.unlink(missing_ok=True)
+        self._generation = generation
+        self._snapshot_size = len(ciphertext)
+        self._journal_size = 0
+        self._journal_seq = 0
 
     # ─── Core Operations ───────────────────────────────────────────────────────
 
@@ -77,42 +246,61 @@ class VaultManager:
         self,
         source_path: Path,
         secure_wipe_original: bool = True,
+        cancel: Optional[threading.Event] = None,
     ) -> bool:
         """
         Encrypt and add a file to the vault.
         Optionally securely delete the original.
+        Setting cancel stops the encryption and discards the partial vault file.
         Returns True on success.
         """
+        vault_file = None
         try:
-            plaintext = source_path.read_bytes()
-            sha256 = get_file_integrity_hash(plaintext)
-            ciphertext = self._crypto.encrypt_file(plaintext)
+            self._check_writable()
+            size_bytes = source_path.stat().st_size
 
             # Generate vault filename from hash of original name + timestamp
             vault_stem = hashlib.sha256(
                 f"{source_path.name}{time.time()}".encode()
             ).hexdigest()
             vault_file = VAULT_DIR / f"{vault_stem}.enc"
-            vault_file.write_bytes(ciphertext)
+            # Hash the plaintext in the same pass that encrypts it
+            hasher = new_integrity_hasher()
+            self._crypto.encrypt_stream(source_path, vault_file, hasher, cancel)
+            digest = hasher.hexdigest()
 
             # Record in index
             vault_id = vault_stem[:16]
-            self._index[vault_id] = {
+            meta = {
                 "original_name": source_path.name,
                 "vault_file": vault_file.name,
                 "added_at": time.time(),
-                "size_bytes": len(plaintext),
-                "sha256": sha256,
+                "size_bytes": size_bytes,
+                "hash_algo": INTEGRITY_ALGO,
+                "digest": digest,
             }
-            self._save_index()
+            with self._index_lock:
+                self._index[vault_id] = meta
+                try:
+                    self._append_journal({"op": "add", "vault_id": vault_id, "meta": meta})
+                except Exception:
+                    del self._index[vault_id]
+                    raise
 
             if secure_wipe_original:
                 secure_delete(source_path)
 
             return True
 
+        except OperationCancelled:
+            log.info("Adding %s was cancelled", source_path.name)
+            if vault_file is not None:
+                vault_file.unlink(missing_ok=True)
+            return False
         except Exception as e:
-            print(f"[VAULT] Add error: {e}")
+            log.error("Add error: %s", e)
+            if vault_file is not None:
+                vault_file.unlink(missing_ok=True)
             return False
 
     def list_files(self) -> list[dict]:
@@ -120,86 +308,125 @@ class VaultManager:
         Return a list of vault entries with metadata.
         Each entry: { vault_id, original_name, added_at, size_bytes }
         """
+        # One directory listing instead of a stat() per entry
+        try:
+            with os.scandir(VAULT_DIR) as it:
+                existing = {entry.name for entry in it}
+        except OSError:
+            existing = set()
+
+        with self._index_lock:
+            entries = list(self._index.items())
+
         results = []
-        for vault_id, meta in self._index.items():
+        for vault_id, meta in entries:
             # Verify vault file still exists
-            vault_file = VAULT_DIR / meta["vault_file"]
-            if vault_file.exists():
+            if meta["vault_file"] in existing:
                 results.append({
                     "vault_id": vault_id,
                     "original_name": meta["original_name"],
                     "added_at": meta["added_at"],
                     "size_bytes": meta["size_bytes"],
-                    "sha256": meta.get("sha256", ""),
+                    "digest": _entry_digest(meta)[1],
                 })
         # Sort by most recently added
         results.sort(key=lambda x: x["added_at"], reverse=True)
         return results
 
-    def extract_file(self, vault_id: str, destination_dir: Path) -> Optional[Path]:
+    def extract_file(
+        self,
+        vault_id: str,
+        destination_dir: Path,
+        cancel: Optional[threading.Event] = None,
+    ) -> Optional[Path]:
         """
         Decrypt and extract a vault file to destination_dir.
         Returns the output Path on success, None on failure.
-        Also verifies SHA-256 integrity before writing.
+        Also verifies the plaintext digest (BLAKE3, or SHA-256 for old entries).
+        Setting cancel stops the decryption and removes the partial output.
         """
-        meta = self._index.get(vault_id)
+        with self._index_lock:
+            meta = self._index.get(vault_id)
         if not meta:
-            print(f"[VAULT] Entry {vault_id} not found in index")
+            log.warning("Entry %s not found in index", vault_id)
             return None
 
         vault_file = VAULT_DIR / meta["vault_file"]
         if not vault_file.exists():
-            print(f"[VAULT] Vault file missing: {vault_file}")
+            log.warning("Vault file missing: %s", vault_file)
             return None
 
         try:
-            ciphertext = vault_file.read_bytes()
-            plaintext = self._crypto.decrypt_file(ciphertext)
-            if plaintext is None:
-                print("[VAULT] Decryption failed — file may be corrupted")
-                return None
-
-            # Integrity check
-            actual_hash = get_file_integrity_hash(plaintext)
-            expected_hash = meta.get("sha256", "")
-            if expected_hash and actual_hash != expected_hash:
-                print("[VAULT] INTEGRITY CHECK FAILED — file tampered!")
-                return None
-
             out_path = destination_dir / meta["original_name"]
-            # Avoid overwrite collision
+            # Avoid overwrite collision: O_EXCL claims a free name atomically
             counter = 1
             stem = out_path.stem
             suffix = out_path.suffix
-            while out_path.exists():
-                out_path = destination_dir / f"{stem}_{counter}{suffix}"
-                counter += 1
+            while True:
+                try:
+                    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL
+                                 | getattr(os, "O_BINARY", 0), 0o600)
+                    break
+                except FileExistsError:
+                    out_path = destination_dir / f"{stem}_{counter}{suffix}"
+                    counter += 1
+
+            algo, expected_hash = _entry_digest(meta)
+            hasher = new_integrity_hasher(algo)
+            if not self._crypto.decrypt_stream(vault_file, os.fdopen(fd, "wb"), hasher, cancel):
+                out_path.unlink(missing_ok=True)
+                if cancel is not None and cancel.is_set():
+                    log.info("Extracting %s was cancelled", vault_id)
+                else:
+                    log.error("Decryption failed — file may be corrupted")
+                return None
+
+            # Integrity check
+            actual_hash = hasher.hexdigest()
+            if expected_hash and not hmac.compare_digest(actual_hash, expected_hash):
+                out_path.unlink(missing_ok=True)
+                log.error("INTEGRITY CHECK FAILED — file tampered!")
+                return None
 
-            out_path.write_bytes(plaintext)
             return out_path
 
         except Exception as e:
-            print(f"[VAULT] Extract error: {e}")
+            log.error("Extract error: %s", e)
             return None
 
     def delete_file(self, vault_id: str) -> bool:
         """Permanently delete a file from the vault."""
-        meta = self._index.get(vault_id)
+        with self._index_lock:
+            meta = self._index.get(vault_id)
         if not meta:
             return False
+        if self._damaged:
+            log.error("Vault index is damaged; not deleting %s", vault_id)
+            return False
 
         vault_file = VAULT_DIR / meta["vault_file"]
         if vault_file.exists():
             secure_delete(vault_file)
 
-        del self._index[vault_id]
-        self._save_index()
+        with self._index_lock:
+            del self._index[vault_id]
+            try:
+                self._append_journal({"op": "del", "vault_id": vault_id})
+            except Exception:
+                self._index[vault_id] = meta
+                raise
         return True
 
     def lock(self):
-        """Lock the vault by wiping the crypto engine."""
-        self._crypto.wipe()
-        self._index = {}
+        """Lock the vault by compacting the index and wiping the crypto engine."""
+        with self._index_lock:
+            if self._journal_size and not self._damaged:
+                try:
+                    self._save_index()
+                except Exception as e:
+                    log.error("Index compaction error: %s", e)
+            self._crypto.wipe()
+            self._index = {}
 
     def file_count(self) -> int:
         return len(self._index)
@@ -231,14 +231,16 @@ class VaultScreen(QWidget):
 
     def populate_files(self, entries: list[dict]):
         """Fill the table from a list of vault entries."""
-        self._vault_ids = []
-        self.table.setRowCount(0)
+        self._vault_ids = [entry["vault_id"] for entry in entries]
 
-        for entry in entries:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self._vault_ids.append(entry["vault_id"])
+        # Size the table once and repaint once, instead of per inserted row
+        sorting = self.table.isSortingEnabled()
+        self.table.setUpdatesEnabled(False)
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(entries))
 
+        for row, entry in enumerate(entries):
             name_item = QTableWidgetItem(entry["original_name"])
             size_item = QTableWidgetItem(fmt_size(entry["size_bytes"]))
             date_item = QTableWidgetItem(fmt_time(entry["added_at"]))
@@ -250,6 +252,9 @@ class VaultScreen(QWidget):
             self.table.setItem(row, 1, size_item)
             self.table.setItem(row, 2, date_item)
 
+        self.table.setSortingEnabled(sorting)
+        self.table.setUpdatesEnabled(True)
+
         count = len(entries)
         self.file_count_lbl.setText(f"{count} file{'s' if count != 1 else ''} stored")
 
@@ -0,0 +1,69 @@
+"""
+workers.py
+QThreadPool jobs that keep slow key derivation and vault file I/O off the
+Qt GUI thread.
+Results come back through JobSignals, which are queued to the GUI thread.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from privexi.usb_key_manager import create_usb_key, load_usb_key
+
+log = logging.getLogger(__name__)
+
+
+class JobSignals(QObject):
+    finished = pyqtSignal(object)
+
+
+class DeriveKeyJob(QRunnable):
+    """Unlock the USB key file. Emits signals.finished(master_key | None)."""
+
+    def __init__(self, secret: str, is_recovery: bool, usb_path: Path):
+        super().__init__()
+        self.signals = JobSignals()
+        self._secret = secret
+        self._is_recovery = is_recovery
+        self._usb_path = usb_path
+
+    def run(self):
+        master_key = load_usb_key(self._usb_path, self._secret, self._is_recovery)
+        self._secret = None
+        self.signals.finished.emit(master_key)
+
+
+class CreateKeyJob(QRunnable):
+    """Write a new USB key file. Emits signals.finished(recovery_code | None)."""
+
+    def __init__(self, usb_path: Path, password: str):
+        super().__init__()
+        self.signals = JobSignals()
+        self._usb_path = usb_path
+        self._password = password
+
+    def run(self):
+        recovery_code = create_usb_key(self._usb_path, self._password)
+        self._password = None
+        self.signals.finished.emit(recovery_code)
+
+
+class VaultJob(QRunnable):
+    """Run one blocking vault operation. Emits signals.finished(result | None)."""
+
+    def __init__(self, op: Callable[..., Any], *args):
+        super().__init__()
+        self.signals = JobSignals()
+        self._op = op
+        self._args = args
+
+    def run(self):
+        try:
+            result = self._op(*self._args)
+        except Exception:
+            log.exception("Vault operation %s failed", getattr(self._op, "__name__", self._op))
+            result = None
+        self.signals.finished.emit(result)